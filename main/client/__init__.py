@@ -0,0 +1,3 @@
+from .session import build_session
+from .submitter import WhisperHubClient, FINISHED_STATUSES, job_finished
+from .worker import WhisperHubWorker
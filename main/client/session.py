@@ -0,0 +1,85 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def build_session(pool_connections=10, pool_maxsize=10, max_retries=3, retry_reads=True):
+    """
+    Build a keep-alive requests Session shared by every call a client makes.
+
+    GETs are retried with backoff on connection errors. With retry_reads
+    they are also retried on read errors and 502/503/504, which is only safe
+    when every GET the client sends is read-only. POSTs are only retried on
+    connection errors, before any of their streamed body has been sent.
+    """
+    if retry_reads:
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False
+        )
+    else:
+        # the request may already have reached the server, so only retry
+        # when the connection was never made
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            other=0,
+            status=0,
+            backoff_factor=0.5,
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False
+        )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def join_url(base_url, path):
+    return f"{base_url.rstrip('/')}/{path.lstrip('/')}"
+
+
+class ClientBase:
+    """Holds the pooled session and base URL shared by the submitter and worker."""
+    def __init__(
+        self,
+        base_url,
+        timeout=30,
+        pool_connections=10,
+        pool_maxsize=10,
+        max_retries=3,
+        retry_reads=True,
+        session=None
+        ):
+
+        self.base_url = base_url
+        self.timeout = timeout
+        # callers may hand in their own session (e.g. a test client)
+        self.session = session or build_session(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries,
+            retry_reads=retry_reads
+        )
+
+    def url(self, path):
+        return join_url(self.base_url, path)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
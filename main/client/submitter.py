@@ -0,0 +1,167 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from requests_toolbelt import MultipartEncoder
+
+from .session import ClientBase
+
+logger = logging.getLogger(__name__)
+
+# statuses after which a job will not change without outside help. 'failed'
+# is left out since the server hands failed low priority jobs out again;
+# wait_for_jobs() treats it as final only for high priority jobs.
+FINISHED_STATUSES = ('completed', 'retrieved', 'audio_missing', 'invalid_ulid')
+
+
+def job_finished(packet, finished_statuses=FINISHED_STATUSES):
+    """Whether a /report-job-status packet describes a job that will not change."""
+    status = packet.get('status')
+    if status in finished_statuses:
+        return True
+    # the server only re-queues failed jobs at low priority
+    return status == 'failed' and packet.get('priority_level') == 'high'
+
+
+class WhisperHubClient(ClientBase):
+    """
+    Client for submitting audio to whisperHub and collecting transcripts.
+
+    All calls share one keep-alive connection pool. Uploads are streamed
+    from disk so large audio files are never read into memory whole.
+    """
+    def __init__(self, base_url, max_workers=4, **kwargs):
+        # one pooled connection per worker thread, so none wait on the pool
+        kwargs.setdefault('pool_maxsize', max(max_workers, 10))
+        super().__init__(base_url, **kwargs)
+        self.max_workers = max_workers
+
+    def submit(self, file_path, priority_level="low", whisper_model="medium", ulid=None):
+        """Upload one audio file and return the ULID the server assigned to it."""
+        file_path = Path(file_path)
+        fields = {
+            'priority_level': priority_level,
+            'whisper_model': whisper_model
+        }
+        if ulid:
+            fields['ulid'] = ulid
+
+        with open(file_path, "rb") as audio_file:
+            fields['file'] = (file_path.name, audio_file, "audio/mpeg")
+            encoder = MultipartEncoder(fields=fields)
+            response = self.session.post(
+                self.url('/new-job'),
+                data=encoder,
+                headers={'Content-Type': encoder.content_type},
+                timeout=self.timeout
+            )
+        response.raise_for_status()
+
+        data = response.json()
+        if 'job_ulid' not in data:
+            raise RuntimeError(f"Server failed to store {file_path.name}: {data}")
+
+        logger.info(f"Submitted {file_path.name} as job {data['job_ulid']}")
+        return data['job_ulid']
+
+    def submit_batch(self, file_paths, **kwargs):
+        """
+        Upload several files concurrently over the shared pool.
+
+        Returns a dict of file path -> ULID in the order the paths were given.
+        Any keyword arguments are passed through to submit().
+        """
+        file_paths = list(file_paths)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self.submit, path, **kwargs) for path in file_paths]
+            return {path: future.result() for path, future in zip(file_paths, futures)}
+
+    def job_status(self, ulid):
+        response = self.session.get(self.url(f'/report-job-status/{ulid}'), timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def job_statuses(self, ulids):
+        """Fetch the status of several jobs concurrently. Returns ulid -> status dict."""
+        ulids = list(ulids)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return dict(zip(ulids, executor.map(self.job_status, ulids)))
+
+    def wait_for_jobs(
+        self,
+        ulids,
+        poll_interval=2.0,
+        max_poll_interval=30.0,
+        timeout=None,
+        finished_statuses=FINISHED_STATUSES
+        ):
+        """
+        Block until every job reaches one of finished_statuses.
+
+        Each round only polls the jobs still outstanding, all at once, and
+        the wait between rounds backs off up to max_poll_interval. A failed
+        high priority job also counts as finished, since the server never
+        retries it. Returns a dict of ulid -> final status packet. Raises
+        TimeoutError if timeout seconds pass first.
+        """
+        outstanding = list(dict.fromkeys(ulids))
+        finished = {}
+        deadline = None if timeout is None else time.monotonic() + timeout
+        interval = poll_interval
+
+        while outstanding:
+            for ulid, packet in self.job_statuses(outstanding).items():
+                if job_finished(packet, finished_statuses):
+                    finished[ulid] = packet
+            outstanding = [ulid for ulid in outstanding if ulid not in finished]
+            if not outstanding:
+                break
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"{len(outstanding)} job(s) still unfinished: {outstanding}")
+                interval = min(interval, remaining)
+
+            logger.debug(f"{len(outstanding)} job(s) outstanding, next poll in {interval:.1f}s")
+            time.sleep(interval)
+            interval = min(interval * 2, max_poll_interval)
+
+        return finished
+
+    def retrieve(self, ulid, dest_path=None, chunk_size=64 * 1024):
+        """
+        Download the transcript for a finished job.
+
+        With dest_path the transcript is streamed to that file and the path is
+        returned; otherwise the transcript text is returned.
+        """
+        url = self.url(f'/retrieve-job/{ulid}')
+        if dest_path is None:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            return response.text
+
+        dest_path = Path(dest_path)
+        with self.session.get(url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            with open(dest_path, "wb") as out_file:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    out_file.write(chunk)
+        logger.info(f"Transcript for job {ulid} saved to {dest_path}")
+        return dest_path
+
+    def transcribe_batch(self, file_paths, timeout=None, finished_statuses=FINISHED_STATUSES, **kwargs):
+        """
+        Submit files, wait for them all, and return file path -> transcript text.
+
+        Jobs that finish in any state other than completed/retrieved map to None.
+        """
+        submitted = self.submit_batch(file_paths, **kwargs)
+        finished = self.wait_for_jobs(submitted.values(), timeout=timeout, finished_statuses=finished_statuses)
+
+        done = [ulid for ulid, packet in finished.items() if packet['status'] in ('completed', 'retrieved')]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            transcripts = dict(zip(done, executor.map(self.retrieve, done)))
+
+        return {path: transcripts.get(ulid) for path, ulid in submitted.items()}
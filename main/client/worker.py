@@ -0,0 +1,278 @@
+import logging
+import shutil
+import tempfile
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from requests_toolbelt import MultipartEncoder
+
+from .session import ClientBase
+
+logger = logging.getLogger(__name__)
+
+
+class Heartbeat:
+    """Sends heartbeats for one job from a background thread until stopped."""
+    def __init__(self, worker, ulid):
+        self.worker = worker
+        self.ulid = ulid
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name=f"whisperhub-heartbeat-{ulid}", daemon=True)
+
+    def _beat(self):
+        while not self._done.wait(self.worker.heartbeat_interval):
+            try:
+                self.worker.send_heartbeat(self.ulid)
+            except Exception as e:
+                logger.warning(f"Heartbeat for job {self.ulid} failed: {e}")
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        # waits for an in-flight heartbeat so it cannot land after the
+        # job's status has been changed by the caller
+        self._done.set()
+        self._thread.join()
+
+
+class WhisperHubWorker(ClientBase):
+    """
+    Claims jobs from whisperHub, transcribes them and returns the results.
+
+    transcribe is any callable taking (audio_path, job_dict) and returning
+    the transcript text. While one job is being transcribed the next job is
+    claimed and its audio downloaded in the background, so the transcriber
+    never waits on the network between jobs. Every claimed job, prefetched
+    or not, gets heartbeats from the moment it is claimed.
+
+    Audio goes to download_dir, or to a temporary directory that is removed
+    on close() when none is given.
+    """
+    def __init__(
+        self,
+        base_url,
+        transcribe,
+        download_dir=None,
+        heartbeat_interval=30.0,
+        idle_interval=10.0,
+        prefetch=True,
+        **kwargs
+        ):
+
+        # claims and heartbeats change job state, so never resend a GET
+        # that may already have reached the server
+        kwargs.setdefault('retry_reads', False)
+        super().__init__(base_url, **kwargs)
+        self.transcribe = transcribe
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_interval = idle_interval
+        self.prefetch = prefetch
+
+        self._owns_download_dir = download_dir is None
+        if self._owns_download_dir:
+            download_dir = tempfile.mkdtemp(prefix="whisperhub-")
+        self.download_dir = Path(download_dir)
+
+        self._stop = threading.Event()
+        self._heartbeats = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisperhub-prefetch")
+
+    def claim(self):
+        """Ask the server for the next job. Returns the job dict or None."""
+        response = self.session.get(self.url('/request-new-job'), timeout=self.timeout)
+        response.raise_for_status()
+        job = response.json()
+        if not job.pop('job_available', False):
+            return None
+        logger.info(f"Claimed job {job['ulid']}")
+        self._heartbeats[job['ulid']] = Heartbeat(self, job['ulid']).start()
+        return job
+
+    def download(self, job, chunk_size=1024 * 1024):
+        """Stream the job's audio to disk and return the local path."""
+        job_dir = self.download_dir / job['ulid']
+        job_dir.mkdir(parents=True, exist_ok=True)
+        audio_path = job_dir / Path(job['file_name']).name
+
+        url = self.url(f"/request-mp3/{job['ulid']}")
+        with self.session.get(url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            with open(audio_path, "wb") as out_file:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    out_file.write(chunk)
+
+        logger.info(f"Audio for job {job['ulid']} downloaded to {audio_path}")
+        return audio_path
+
+    def send_heartbeat(self, ulid):
+        response = self.session.get(self.url(f'/heartbeat/{ulid}'), timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def end_heartbeat(self, ulid):
+        heartbeat = self._heartbeats.pop(ulid, None)
+        if heartbeat:
+            heartbeat.stop()
+
+    def return_job(self, ulid, transcript):
+        self.end_heartbeat(ulid)
+        encoder = MultipartEncoder(fields={'ulid': ulid, 'transcript': transcript})
+        response = self.session.post(
+            self.url('/return-job'),
+            data=encoder,
+            headers={'Content-Type': encoder.content_type},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        logger.info(f"Transcript for job {ulid} returned")
+        return response.json()
+
+    def report_failure(self, ulid):
+        self.end_heartbeat(ulid)
+        try:
+            response = self.session.get(self.url(f'/transcription-failure/{ulid}'), timeout=self.timeout)
+            response.raise_for_status()
+        except Exception as e:
+            logger.error(f"Could not report failure for job {ulid}: {e}")
+
+    def report_audio_missing(self, ulid):
+        self.end_heartbeat(ulid)
+        try:
+            response = self.session.get(self.url(f'/audio-missing/{ulid}'), timeout=self.timeout)
+            response.raise_for_status()
+        except Exception as e:
+            logger.error(f"Could not report missing audio for job {ulid}: {e}")
+
+    def release(self, ulid):
+        """Hand a claimed but unstarted job back to the queue as pending."""
+        self.end_heartbeat(ulid)
+        try:
+            response = self.session.get(self.url(f'/release-job/{ulid}'), timeout=self.timeout)
+            response.raise_for_status()
+            logger.info(f"Released job {ulid}")
+        except Exception as e:
+            logger.error(f"Could not release job {ulid}: {e}")
+
+    def claim_and_download(self):
+        """
+        Claim the next job and fetch its audio. Returns the job dict, or None
+        when the queue is empty, the server is unreachable or stop() was called.
+
+        A job whose audio the server no longer has (404) is marked
+        audio_missing, which the server never hands out again, and the next
+        job is claimed. Any other download error reports the job as failed.
+        The server offers failed low priority jobs again, so if it offers one
+        that already failed to download during this call, None is returned
+        and run() backs off for idle_interval before trying again.
+        """
+        failed_downloads = set()
+        while not self._stop.is_set():
+            try:
+                job = self.claim()
+            except Exception as e:
+                logger.error(f"Could not claim a job: {e}")
+                return None
+            if not job:
+                return None
+
+            ulid = job['ulid']
+            if ulid in failed_downloads:
+                self.report_failure(ulid)
+                return None
+
+            try:
+                job['audio_path'] = self.download(job)
+                return job
+            except requests.HTTPError as e:
+                shutil.rmtree(self.download_dir / ulid, ignore_errors=True)
+                if e.response is not None and e.response.status_code == 404:
+                    logger.error(f"Audio for job {ulid} is missing on the server")
+                    self.report_audio_missing(ulid)
+                else:
+                    logger.error(f"Download for job {ulid} failed: {e}")
+                    self.report_failure(ulid)
+                    failed_downloads.add(ulid)
+            except Exception as e:
+                logger.error(f"Download for job {ulid} failed: {e}")
+                self.report_failure(ulid)
+                shutil.rmtree(self.download_dir / ulid, ignore_errors=True)
+                failed_downloads.add(ulid)
+
+        return None
+
+    def process(self, job):
+        """Transcribe one claimed and downloaded job and hand the result back."""
+        ulid = job['ulid']
+        try:
+            transcript = self.transcribe(job['audio_path'], job)
+            self.return_job(ulid, transcript)
+            return True
+        except Exception as e:
+            logger.error(f"Transcription of job {ulid} failed: {e}", exc_info=True)
+            self.report_failure(ulid)
+            return False
+        except BaseException:
+            # interrupted (e.g. Ctrl-C): hand the job back rather than strand it
+            self.release(ulid)
+            raise
+        finally:
+            self.end_heartbeat(ulid)
+            shutil.rmtree(Path(job['audio_path']).parent, ignore_errors=True)
+
+    def run(self, max_jobs=None, stop_when_idle=False):
+        """
+        Work through the queue until stop() is called.
+
+        max_jobs caps how many jobs are processed; stop_when_idle returns as
+        soon as the server has nothing left. Returns the number of jobs
+        processed. A job prefetched but never started is released back to
+        pending so any worker can claim it again.
+        """
+        processed = 0
+        next_job = None
+        try:
+            while not self._stop.is_set():
+                if max_jobs is not None and processed >= max_jobs:
+                    break
+
+                if next_job is not None:
+                    job = next_job.result()
+                    next_job = None
+                else:
+                    job = self.claim_and_download()
+
+                if job is None:
+                    if stop_when_idle:
+                        break
+                    self._stop.wait(self.idle_interval)
+                    continue
+
+                processed += 1
+                more_wanted = max_jobs is None or processed < max_jobs
+                if self.prefetch and more_wanted and not self._stop.is_set():
+                    next_job = self._executor.submit(self.claim_and_download)
+
+                self.process(job)
+        finally:
+            if next_job is not None:
+                leftover = next_job.result()
+                if leftover:
+                    self.release(leftover['ulid'])
+                    shutil.rmtree(Path(leftover['audio_path']).parent, ignore_errors=True)
+
+        return processed
+
+    def stop(self):
+        self._stop.set()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        # anything still heartbeating was claimed but never finished
+        for ulid in list(self._heartbeats):
+            self.release(ulid)
+        if self._owns_download_dir:
+            shutil.rmtree(self.download_dir, ignore_errors=True)
+        super().close()
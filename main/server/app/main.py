@@ -76,7 +76,7 @@ async def new_job(
         whisper_model=whisper_model,
         filename=file.filename, 
         file=file,
-        ulid=ulid
+        ulid_=ulid
         )
     
     # Store the job and return status
@@ -183,6 +183,7 @@ async def report_job_status(ulid):
         
         data_packet = {
             'status': job_status,
+            'priority_level': job.priority_level,
             'created_at': job_creation_time,
             'updated_at': job_update
         }
@@ -299,3 +300,59 @@ def transcription_failure(ulid):
         raise HTTPException(status_code=500, detail="An internal server error occurred.")
     finally:
         session.close()
+
+@app.get('/release-job/{ulid}')
+def release_job(ulid):
+    '''Put a claimed job back in the queue without marking it as failed'''
+    logger.info(f"Release requested for job {ulid}")
+    session = SessionLocal()
+
+    try:
+        job = session.query(Jobs).filter(Jobs.ulid == ulid).first()
+        if not job:
+            logger.error(f"Job {ulid} not found on release")
+            raise HTTPException(status_code=404, detail="Job not found")
+
+        # only a job a worker is holding can go back in the queue
+        if job.status not in ['transcribing', 'receiving heartbeat']:
+            logger.warning(f"Job {ulid} not released. Current status: {job.status}")
+            raise HTTPException(status_code=409, detail=f"Job not claimed. Current status: {job.status}")
+
+        job.status = 'pending'
+        session.commit()
+        logger.info(f"Job {ulid} status reset to pending")
+        return {'status': 'pending', 'ulid': ulid}
+    except HTTPException:
+        raise
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Error in release-job api for ulid {ulid}: {e}")
+        raise HTTPException(status_code=500, detail="An internal server error occurred.")
+    finally:
+        session.close()
+
+@app.get('/audio-missing/{ulid}')
+def audio_missing(ulid):
+    '''Mark a job whose audio is gone so it is never handed out again'''
+    logger.warning(f"Missing audio reported for job {ulid}")
+    session = SessionLocal()
+
+    try:
+        job = session.query(Jobs).filter(Jobs.ulid == ulid).first()
+        if not job:
+            logger.error(f"Job {ulid} not found on missing audio report")
+            raise HTTPException(status_code=404, detail="Job not found")
+
+        # not 'failed', which would put low priority jobs back in the queue
+        job.status = 'audio_missing'
+        session.commit()
+        logger.info(f"Job {ulid} status updated to audio_missing")
+        return {'status': 'audio_missing', 'ulid': ulid}
+    except HTTPException:
+        raise
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Error in audio-missing api for ulid {ulid}: {e}")
+        raise HTTPException(status_code=500, detail="An internal server error occurred.")
+    finally:
+        session.close()
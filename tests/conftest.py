@@ -0,0 +1,51 @@
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import sqlalchemy as sa
+import uvicorn
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "main"))
+sys.path.insert(0, str(ROOT / "main" / "server"))
+
+
+@pytest.fixture(scope="session")
+def server(tmp_path_factory):
+    """Serve the app in-process on a free port, backed by a temp SQLite DB."""
+    workdir = tmp_path_factory.mktemp("server")
+
+    # the logger opens whisperhub.log relative to the working directory
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        from app import app, db, utils
+    finally:
+        os.chdir(cwd)
+
+    engine = sa.create_engine(f"sqlite:///{workdir / 'whisperhub.db'}")
+    db.SessionLocal.configure(bind=engine)
+    utils.AUDIO_FILE_DIR = workdir / "audio_files"
+
+    uvicorn_server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=uvicorn_server.run, daemon=True)
+    thread.start()
+    while not uvicorn_server.started:
+        time.sleep(0.01)
+    port = uvicorn_server.servers[0].sockets[0].getsockname()[1]
+
+    yield SimpleNamespace(url=f"http://127.0.0.1:{port}", db=db, engine=engine, audio_dir=utils.AUDIO_FILE_DIR)
+
+    uvicorn_server.should_exit = True
+    thread.join()
+
+
+@pytest.fixture(autouse=True)
+def clean_db(server):
+    # no migrations ship with the repo, so build the schema from the models
+    server.db.Base.metadata.drop_all(server.engine)
+    server.db.Base.metadata.create_all(server.engine)
@@ -0,0 +1,160 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from client import WhisperHubClient, WhisperHubWorker
+
+
+def make_audio(directory, name, size):
+    path = Path(directory) / name
+    path.write_bytes(b"\x00" * size)
+    return path
+
+
+def fake_transcribe(audio_path, job):
+    return f"{job['file_name']}:{Path(audio_path).stat().st_size}"
+
+
+def wait_for_status(hub, ulid, status, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if hub.job_status(ulid)['status'] == status:
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_submit_run_wait_retrieve(server, tmp_path):
+    files = [make_audio(tmp_path, f"clip{i}.mp3", 100_000 * (i + 1)) for i in range(3)]
+
+    with WhisperHubClient(server.url) as hub:
+        submitted = hub.submit_batch(files[:2])
+        # a caller supplied ULID is kept by the server
+        assert hub.submit(files[2], ulid="custom-ulid") == "custom-ulid"
+        submitted[files[2]] = "custom-ulid"
+
+        worker = WhisperHubWorker(server.url, fake_transcribe, heartbeat_interval=0.05)
+        with worker:
+            assert worker.run(stop_when_idle=True) == 3
+        assert not worker.download_dir.exists()
+
+        finished = hub.wait_for_jobs(submitted.values(), poll_interval=0.05, timeout=5)
+        assert {packet['status'] for packet in finished.values()} == {'completed'}
+
+        for path, ulid in submitted.items():
+            assert hub.retrieve(ulid) == f"{path.name}:{path.stat().st_size}"
+
+        dest = hub.retrieve(submitted[files[0]], dest_path=tmp_path / "clip0.txt")
+        assert dest.read_text() == "clip0.mp3:100000"
+
+
+def test_failing_transcribe_marks_job_failed(server, tmp_path):
+    def broken_transcribe(audio_path, job):
+        raise RuntimeError("model crashed")
+
+    with WhisperHubClient(server.url) as hub:
+        ulid = hub.submit(make_audio(tmp_path, "bad.mp3", 1000), priority_level="high")
+
+        with WhisperHubWorker(server.url, broken_transcribe) as worker:
+            assert worker.run(stop_when_idle=True) == 1
+
+        # the server never retries a failed high priority job, so it is final
+        finished = hub.wait_for_jobs([ulid], poll_interval=0.05, timeout=1)
+        assert finished[ulid]['status'] == 'failed'
+
+
+def test_transcribe_batch_returns_none_for_failed_high_priority_job(server, tmp_path):
+    def broken_transcribe(audio_path, job):
+        raise RuntimeError("model crashed")
+
+    worker = WhisperHubWorker(server.url, broken_transcribe, idle_interval=0.05)
+    thread = threading.Thread(target=worker.run)
+    thread.start()
+    try:
+        with WhisperHubClient(server.url) as hub:
+            path = make_audio(tmp_path, "bad.mp3", 1000)
+            assert hub.transcribe_batch([path], priority_level="high", timeout=10) == {path: None}
+    finally:
+        worker.stop()
+        thread.join()
+        worker.close()
+
+
+def test_stop_releases_prefetched_job(server, tmp_path):
+    with WhisperHubClient(server.url) as hub:
+        first = hub.submit(make_audio(tmp_path, "first.mp3", 1000), priority_level="high")
+        second = hub.submit(make_audio(tmp_path, "second.mp3", 2000), priority_level="high")
+        seen = {}
+
+        def slow_transcribe(audio_path, job):
+            # the prefetched job is heartbeating while this one runs
+            seen['heartbeat'] = wait_for_status(hub, second, 'receiving heartbeat')
+            worker.stop()
+            return fake_transcribe(audio_path, job)
+
+        worker = WhisperHubWorker(server.url, slow_transcribe, heartbeat_interval=0.05)
+        with worker:
+            assert worker.run() == 1
+
+        assert seen['heartbeat']
+        assert hub.job_status(first)['status'] == 'completed'
+        assert hub.job_status(second)['status'] == 'pending'
+
+        # high priority jobs are only claimed while pending, so it must be back in the queue
+        with WhisperHubWorker(server.url, fake_transcribe) as worker:
+            assert worker.run(stop_when_idle=True) == 1
+        assert hub.job_status(second)['status'] == 'completed'
+
+
+@pytest.mark.parametrize("priority_level", ["low", "high"])
+def test_missing_audio_moves_on_to_next_job(server, tmp_path, priority_level):
+    with WhisperHubClient(server.url) as hub:
+        missing = hub.submit(make_audio(tmp_path, "missing.mp3", 1000), priority_level=priority_level)
+        present = hub.submit(make_audio(tmp_path, "present.mp3", 1000), priority_level=priority_level)
+        (server.audio_dir / missing / "missing.mp3").unlink()
+
+        with WhisperHubWorker(server.url, fake_transcribe) as worker:
+            assert worker.run(stop_when_idle=True) == 1
+
+        assert hub.job_status(missing)['status'] == 'audio_missing'
+        assert hub.job_status(present)['status'] == 'completed'
+        assert hub.wait_for_jobs([missing], timeout=1)[missing]['status'] == 'audio_missing'
+
+
+def test_interrupted_transcription_releases_job(server, tmp_path):
+    def interrupted_transcribe(audio_path, job):
+        raise KeyboardInterrupt
+
+    with WhisperHubClient(server.url) as hub:
+        ulid = hub.submit(make_audio(tmp_path, "clip.mp3", 1000), priority_level="high")
+
+        with pytest.raises(KeyboardInterrupt):
+            with WhisperHubWorker(server.url, interrupted_transcribe) as worker:
+                worker.run()
+        assert hub.job_status(ulid)['status'] == 'pending'
+
+        with WhisperHubWorker(server.url, fake_transcribe) as worker:
+            assert worker.run(stop_when_idle=True) == 1
+        assert hub.job_status(ulid)['status'] == 'completed'
+
+
+def test_close_releases_claimed_jobs(server, tmp_path):
+    with WhisperHubClient(server.url) as hub:
+        ulid = hub.submit(make_audio(tmp_path, "clip.mp3", 1000), priority_level="high")
+
+        with WhisperHubWorker(server.url, fake_transcribe) as worker:
+            assert worker.claim()['ulid'] == ulid
+        assert hub.job_status(ulid)['status'] == 'pending'
+
+
+def test_release_refuses_unclaimed_job(server, tmp_path):
+    with WhisperHubClient(server.url) as hub:
+        ulid = hub.submit(make_audio(tmp_path, "clip.mp3", 1000))
+        assert hub.session.get(hub.url(f'/release-job/{ulid}')).status_code == 409
+
+        with WhisperHubWorker(server.url, fake_transcribe) as worker:
+            assert worker.run(stop_when_idle=True) == 1
+        assert hub.session.get(hub.url(f'/release-job/{ulid}')).status_code == 409
+        assert hub.job_status(ulid)['status'] == 'completed'